@@ -0,0 +1,558 @@
+"""
+Visualize a robot URDF and its meshes in the Rerun viewer (https://rerun.io/).
+
+Logs the kinematic tree once with its original joint transforms, then streams a
+number of frames with randomized joint rotations so you can inspect the link
+hierarchy animating in the viewer.
+
+Requires extra dependencies: pip install rerun-sdk urdf-parser-py
+"""
+
+import argparse
+import pathlib
+
+import numpy as np
+import rerun as rr
+import scipy.spatial.transform as st
+import trimesh
+from scipy.spatial.transform import Rotation as R
+from PIL import Image
+from urdf_parser_py import urdf as urdf_parser
+
+from mani_skill import PACKAGE_ASSET_DIR
+
+try:
+    # optional: C-backed STL parsing, much faster than trimesh's on large files
+    from stl import mesh as numpy_stl
+except ImportError:
+    numpy_stl = None
+
+try:
+    import numba
+
+    @numba.njit(cache=True, parallel=True)
+    def _sample_uniform_quats(out):
+        """Fill ``out`` of shape (N, 4) with quaternions drawn uniformly from
+        SO(3) via Shoemake's subgroup algorithm, in scipy's (x, y, z, w)
+        order."""
+        for i in numba.prange(out.shape[0]):
+            u1 = np.random.random()
+            u2 = 2.0 * np.pi * np.random.random()
+            u3 = 2.0 * np.pi * np.random.random()
+            a = np.sqrt(1.0 - u1)
+            b = np.sqrt(u1)
+            out[i, 0] = a * np.sin(u2)
+            out[i, 1] = a * np.cos(u2)
+            out[i, 2] = b * np.sin(u3)
+            out[i, 3] = b * np.cos(u3)
+
+except ImportError:
+    numba = None
+
+    def _sample_uniform_quats(out):
+        """Fallback without numba: one batched scipy draw into ``out``."""
+        out[:] = R.random(num=out.shape[0]).as_quat()
+
+
+def _quat_mul(q1: np.ndarray, q2: np.ndarray) -> np.ndarray:
+    """Hamilton product of two quaternions in scipy's (x, y, z, w) order.
+
+    Accepts single quaternions of shape (4,) or batches of shape (N, 4);
+    inputs broadcast against each other along the leading axes.
+    """
+    x1, y1, z1, w1 = q1[..., 0], q1[..., 1], q1[..., 2], q1[..., 3]
+    x2, y2, z2, w2 = q2[..., 0], q2[..., 1], q2[..., 2], q2[..., 3]
+    return np.stack(
+        [
+            w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2,
+            w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2,
+            w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2,
+            w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2,
+        ],
+        axis=-1,
+    )
+
+
+def _quat_rotate(q: np.ndarray, v: np.ndarray) -> np.ndarray:
+    """Rotate vector(s) ``v`` of shape (..., 3) by quaternion(s) ``q`` of
+    shape (..., 4) in (x, y, z, w) order, without building rotation objects."""
+    q_xyz = q[..., :3]
+    t = 2.0 * np.cross(q_xyz, v)
+    return v + q[..., 3:4] * t + np.cross(q_xyz, t)
+
+
+class URDFLogger:
+    """Logs a URDF file and its meshes to Rerun, one entity per link/joint."""
+
+    def __init__(self, filepath: str):
+        self.filepath = pathlib.Path(filepath)
+        self.urdf = urdf_parser.URDF.from_xml_file(filepath)
+        self.mat_name_to_mat = {mat.name: mat for mat in self.urdf.materials}
+        # The URDF is immutable after load, so resolve the tree root (get_root
+        # scans the parent map on every call) and every link/joint entity path
+        # once here instead of re-walking the kinematic chain on each log call.
+        self._root_name = self.urdf.get_root()
+        self._chain_cache = {}
+        self._joint_paths = {
+            joint.name: self.joint_entity_path(joint) for joint in self.urdf.joints
+        }
+        self._link_paths = {
+            link.name: self.link_entity_path(link) for link in self.urdf.links
+        }
+        # joint axes and types are constant too; normalize each axis once
+        self._joint_axis_unit = {}
+        self._joint_type = {}
+        for joint in self.urdf.joints:
+            axis = (
+                np.asarray(joint.axis, dtype=np.float64)
+                if joint.axis is not None
+                else np.array([1.0, 0.0, 0.0])
+            )
+            self._joint_axis_unit[joint.name] = axis / np.linalg.norm(axis)
+            self._joint_type[joint.name] = joint.type
+        # origins never change either; convert each one to a rerun transform
+        # exactly once so log calls do a dict lookup instead of a scipy
+        # euler->quat conversion. The raw (translation, quaternion) pose is
+        # kept alongside for composing animated joint transforms.
+        self._origin_transform = {}
+        self._origin_pose = {}
+        origins = [joint.origin for joint in self.urdf.joints]
+        for link in self.urdf.links:
+            origins.extend(visual.origin for visual in link.visuals)
+        self._cache_origins(origins)
+        identity_pose = (np.zeros(3), np.array([0.0, 0.0, 0.0, 1.0]))
+        self._joint_origin_pose = {
+            joint.name: self._origin_pose.get(id(joint.origin), identity_pose)
+            for joint in self.urdf.joints
+        }
+        # mesh files referenced by several visuals are loaded and processed
+        # only once, keyed by (resolved path, scale)
+        self._mesh_cache = {}
+        # fully-built rr.Mesh3D archetypes per visual, so repeated logging is
+        # branchless over geometry/material type
+        self._visual_archetypes = {}
+        # broadcast (V, 4) uint8 color arrays, shared between visuals that use
+        # the same material on meshes of the same size
+        self._vertex_color_cache = {}
+        # textures decoded to (H, W, 4) uint8 arrays, once per file
+        self._texture_cache = {}
+        # per-frame scratch buffer, filled in place each frame so the hot
+        # loop performs no heap allocations
+        self._frame_quats = np.empty((len(self.urdf.joints), 4), dtype=np.float64)
+
+    def get_chain(self, target: str) -> list:
+        # safe to memoize since the URDF is immutable after load
+        chain = self._chain_cache.get(target)
+        if chain is None:
+            chain = self.urdf.get_chain(self._root_name, target)
+            self._chain_cache[target] = chain
+        return chain
+
+    def link_entity_path(self, link: urdf_parser.Link) -> str:
+        """Entity path of a link, e.g. `root/link_0/link_1`."""
+        link_names = self.get_chain(link.name)[0::2]  # skip the joints
+        return "/".join(link_names)
+
+    def joint_entity_path(self, joint: urdf_parser.Joint) -> str:
+        """Entity path of a joint, which is the path of its child link."""
+        link_names = self.get_chain(joint.child)[0::2]  # skip the joints
+        return "/".join(link_names)
+
+    def _cache_origins(self, origins: list) -> None:
+        """Convert URDF origins (xyz translation + rpy euler angles) to rerun
+        transforms, stored by identity.
+
+        All euler->quaternion conversions run as a single batched scipy call
+        rather than one Rotation construction per origin.
+        """
+        origins = {
+            id(origin): origin
+            for origin in origins
+            if origin is not None and id(origin) not in self._origin_transform
+        }
+        with_rpy = [o for o in origins.values() if o.rpy is not None]
+        quats = {}
+        if with_rpy:
+            batched = st.Rotation.from_euler(
+                "xyz", np.asarray([o.rpy for o in with_rpy])
+            ).as_quat()
+            quats = {id(o): quat for o, quat in zip(with_rpy, batched)}
+        for key, origin in origins.items():
+            # xyz and rpy are both optional in the URDF spec; missing parts
+            # are simply omitted from the transform
+            translation = np.asarray(origin.xyz) if origin.xyz is not None else None
+            quat = quats.get(key)
+            self._origin_transform[key] = rr.Transform3D(
+                translation=translation, quaternion=quat
+            )
+            self._origin_pose[key] = (
+                translation if translation is not None else np.zeros(3),
+                quat if quat is not None else np.array([0.0, 0.0, 0.0, 1.0]),
+            )
+
+    def origin_to_transform(self, origin) -> rr.Transform3D:
+        """Look up the precomputed transform of a URDF origin."""
+        if origin is None:
+            return None
+        return self._origin_transform.get(id(origin))
+
+    def _joint_motion_transform(self, joint: urdf_parser.Joint, value: float):
+        """Transform of a joint displaced by ``value`` along/about its axis."""
+        axis = self._joint_axis_unit[joint.name]
+        joint_type = self._joint_type[joint.name]
+        if joint_type in ("revolute", "continuous"):
+            quat = R.from_rotvec(axis * value).as_quat()
+            return rr.Transform3D(quaternion=quat)
+        elif joint_type == "prismatic":
+            return rr.Transform3D(translation=axis * value)
+        return rr.Transform3D(translation=[0.0, 0.0, 0.0])
+
+    def _compose(self, trans1, quat1, trans2, quat2) -> rr.Transform3D:
+        """Compose two (translation, quaternion) transforms.
+
+        Uses the plain-NumPy quaternion helpers rather than scipy Rotation
+        objects, so composing stays a single vectorized kernel and works on
+        batched (N, 3)/(N, 4) inputs too.
+        """
+        quat1 = np.asarray(quat1)
+        quat2 = np.asarray(quat2)
+        translation = np.asarray(trans1) + _quat_rotate(quat1, np.asarray(trans2))
+        return rr.Transform3D(
+            translation=translation, quaternion=_quat_mul(quat1, quat2)
+        )
+
+    def resolve_mesh_path(self, filename: str) -> pathlib.Path:
+        """Resolve a mesh filename from the URDF to an absolute path."""
+        if filename.startswith("package://"):
+            return PACKAGE_ASSET_DIR / filename[len("package://") :]
+        return (self.filepath.parent / filename).resolve()
+
+    def setup(self) -> None:
+        """Log the full tree once: meshes and link transforms as static data,
+        joint origins on the timeline (at the currently set time). Call this a
+        single time before streaming joint updates."""
+        rr.log("", rr.ViewCoordinates.RIGHT_HAND_Z_UP, static=True)
+        for link in self.urdf.links:
+            self.log_link(link)
+        for joint in self.urdf.joints:
+            self.log_joint(joint)
+
+    def log_random_joint_motion(self, num_frames: int, timeline: str = "frame") -> None:
+        """Stream ``num_frames`` frames of random joint rotations using
+        columnar logging: one batched quaternion draw for the whole series and
+        one ``rr.send_columns`` per joint, instead of one ``rr.log`` (and one
+        Python/Rust crossing) per joint per frame.
+
+        Each frame's rotation is composed onto the joint's origin pose and
+        sent as a full translation+quaternion column, so the streamed
+        transforms fully describe the joint and nothing static needs to (or
+        may) shadow them.
+        """
+        num_joints = len(self.urdf.joints)
+        quats = np.empty((num_frames * num_joints, 4))
+        _sample_uniform_quats(quats)
+        quats = quats.reshape(num_frames, num_joints, 4)
+        frames = np.arange(1, num_frames + 1)
+        for i, joint in enumerate(self.urdf.joints):
+            origin_trans, origin_quat = self._joint_origin_pose[joint.name]
+            rr.send_columns(
+                self._joint_paths[joint.name],
+                indexes=[rr.TimeColumn(timeline, sequence=frames)],
+                columns=rr.Transform3D.columns(
+                    translation=np.broadcast_to(origin_trans, (num_frames, 3)),
+                    quaternion=_quat_mul(origin_quat, quats[:, i]),
+                ),
+            )
+
+    def update_joints_random(self) -> None:
+        """Log a random rotation composed onto every joint's origin, for the
+        currently set time; meshes and link transforms logged by :meth:`setup`
+        are left untouched. Per-frame alternative to
+        :meth:`log_random_joint_motion` for live streaming."""
+        # sample all joint rotations in one kernel call, writing into the
+        # preallocated buffer; logging uses views into it
+        _sample_uniform_quats(self._frame_quats)
+        for i, joint in enumerate(self.urdf.joints):
+            origin_trans, origin_quat = self._joint_origin_pose[joint.name]
+            rr.log(
+                self._joint_paths[joint.name],
+                rr.Transform3D(
+                    translation=origin_trans,
+                    quaternion=_quat_mul(origin_quat, self._frame_quats[i]),
+                ),
+            )
+
+    def log_link(self, link: urdf_parser.Link) -> None:
+        entity_path = self._link_paths[link.name]
+        for i, visual in enumerate(link.visuals):
+            self.log_visual(entity_path + f"/visual_{i}", visual)
+
+    def log_joint(self, joint: urdf_parser.Joint) -> None:
+        # joint transforms are animated later on the same entities, and static
+        # data unconditionally shadows temporal data of the same component, so
+        # the origin must go on the timeline (not static) as the rest pose
+        transform = self.origin_to_transform(joint.origin)
+        if transform is not None:
+            rr.log(self._joint_paths[joint.name], transform)
+
+    def log_visual(self, entity_path: str, visual: urdf_parser.Visual) -> None:
+        """Log a visual's transform and meshes. All type dispatch and material
+        handling happens in :meth:`_build_visual_archetypes` on first use;
+        afterwards this is a dict lookup plus rr.log calls."""
+        transform = self.origin_to_transform(visual.origin)
+        if transform is not None:
+            rr.log(entity_path, transform, static=True)
+        archetypes = self._visual_archetypes.get(id(visual))
+        if archetypes is None:
+            archetypes = self._build_visual_archetypes(visual)
+            self._visual_archetypes[id(visual)] = archetypes
+        for suffix, mesh3d in archetypes:
+            rr.log(entity_path + suffix, mesh3d, static=True)
+
+    def _build_visual_archetypes(self, visual: urdf_parser.Visual) -> list:
+        """Classify a visual's geometry and material once and build reusable
+        ``(entity path suffix, rr.Mesh3D)`` pairs for it."""
+        material = None
+        if visual.material is not None:
+            if visual.material.color is None and visual.material.texture is None:
+                material = self.mat_name_to_mat.get(visual.material.name)
+            else:
+                material = visual.material
+
+        if isinstance(visual.geometry, urdf_parser.Mesh):
+            resolved_path = self.resolve_mesh_path(visual.geometry.filename)
+            scale = (
+                tuple(visual.geometry.scale)
+                if visual.geometry.scale is not None
+                else None
+            )
+            key = (resolved_path, scale)
+            payloads = self._mesh_cache.get(key)
+            if payloads is None:
+                payloads = self._mesh_payloads(
+                    self._load_mesh_fast(resolved_path), scale
+                )
+                self._mesh_cache[key] = payloads
+        elif isinstance(visual.geometry, urdf_parser.Box):
+            payloads = self._mesh_payloads(
+                trimesh.creation.box(extents=visual.geometry.size)
+            )
+        elif isinstance(visual.geometry, urdf_parser.Cylinder):
+            payloads = self._mesh_payloads(
+                trimesh.creation.cylinder(
+                    radius=visual.geometry.radius, height=visual.geometry.length
+                )
+            )
+        elif isinstance(visual.geometry, urdf_parser.Sphere):
+            payloads = self._mesh_payloads(
+                trimesh.creation.icosphere(radius=visual.geometry.radius)
+            )
+        else:
+            raise NotImplementedError(
+                f"Unsupported geometry type: {type(visual.geometry)}"
+            )
+
+        archetypes = []
+        for i, (mesh, geometry) in enumerate(payloads):
+            vertex_colors = albedo_texture = None
+            if material is not None and not isinstance(
+                mesh.visual, trimesh.visual.texture.TextureVisuals
+            ):
+                if material.color is not None:
+                    vertex_colors = self._material_vertex_colors(
+                        material, len(geometry[0])
+                    )
+                elif material.texture is not None:
+                    albedo_texture = self._load_texture(
+                        self.resolve_mesh_path(material.texture.filename)
+                    )
+            archetypes.append(
+                (
+                    "" if len(payloads) == 1 else f"/part_{i}",
+                    self._build_mesh3d(mesh, geometry, vertex_colors, albedo_texture),
+                )
+            )
+        return archetypes
+
+    def _load_texture(self, path: pathlib.Path) -> np.ndarray:
+        """Decode a texture file to a (H, W, 4) uint8 array, once per file.
+
+        PIL's Image.open is lazy and would otherwise re-decode on first pixel
+        access for every visual that references the texture.
+        """
+        texture = self._texture_cache.get(path)
+        if texture is None:
+            texture = np.asarray(Image.open(str(path)).convert("RGBA"))
+            self._texture_cache[path] = texture
+        return texture
+
+    def _material_vertex_colors(
+        self, material: urdf_parser.Material, num_vertices: int
+    ) -> np.ndarray:
+        """Broadcast a material's rgba (floats in [0, 1] per the URDF spec) to
+        a (V, 4) uint8 array, once per (material, vertex count) pair."""
+        key = (id(material), num_vertices)
+        colors = self._vertex_color_cache.get(key)
+        if colors is None:
+            rgba = (np.asarray(material.color.rgba, dtype=np.float64) * 255.0).round()
+            colors = np.ascontiguousarray(
+                np.broadcast_to(rgba.astype(np.uint8), (num_vertices, 4))
+            )
+            self._vertex_color_cache[key] = colors
+        return colors
+
+    @staticmethod
+    def _load_mesh_fast(path: pathlib.Path):
+        """Load a mesh file, dispatching on extension.
+
+        Binary/ASCII STL files go through numpy-stl's C-backed parser when it
+        is installed, skipping trimesh's format detection and Python-level
+        parsing; the triangles are wrapped in a Trimesh with ``process=False``
+        so no dedup/validation pass runs. Everything else (and STL without
+        numpy-stl) falls back to trimesh.load_mesh.
+        """
+        if path.suffix.lower() == ".stl" and numpy_stl is not None:
+            stl_mesh = numpy_stl.Mesh.from_file(str(path))
+            vertices = stl_mesh.vectors.reshape(-1, 3)
+            faces = np.arange(len(vertices), dtype=np.uint32).reshape(-1, 3)
+            return trimesh.Trimesh(vertices=vertices, faces=faces, process=False)
+        return trimesh.load_mesh(str(path))
+
+    @staticmethod
+    def _vertex_normals(vertices: np.ndarray, faces: np.ndarray) -> np.ndarray:
+        """Area-weighted vertex normals, fully vectorized.
+
+        Unnormalized face cross products are proportional to triangle area, so
+        scatter-adding them onto their three corners yields the area-weighted
+        average normal per vertex without any per-vertex Python loop.
+        """
+        v0, v1, v2 = (
+            vertices[faces[:, 0]],
+            vertices[faces[:, 1]],
+            vertices[faces[:, 2]],
+        )
+        face_normals = np.cross(v1 - v0, v2 - v0)
+        normals = np.zeros_like(vertices)
+        np.add.at(normals, faces[:, 0], face_normals)
+        np.add.at(normals, faces[:, 1], face_normals)
+        np.add.at(normals, faces[:, 2], face_normals)
+        normals /= np.linalg.norm(normals, axis=1, keepdims=True) + 1e-20
+        return normals
+
+    @staticmethod
+    def _mesh_payloads(mesh_or_scene, scale=None) -> list:
+        """Split a loaded mesh/scene into (mesh, (vertices, faces, normals))
+        tuples with the geometry arrays extracted once, contiguously."""
+        if isinstance(mesh_or_scene, trimesh.Scene):
+            meshes = mesh_or_scene.dump()
+        else:
+            meshes = [mesh_or_scene]
+        payloads = []
+        for mesh in meshes:
+            if scale is not None:
+                mesh.apply_scale(scale)
+            # convert to the dtypes rerun stores natively (f32 positions and
+            # normals, u32 indices) so the Rust side ingests the buffers
+            # without a copy/convert pass on every log call
+            vertices = np.ascontiguousarray(mesh.vertices, dtype=np.float32)
+            faces = np.ascontiguousarray(mesh.faces, dtype=np.uint32)
+            normals = np.ascontiguousarray(
+                URDFLogger._vertex_normals(vertices, faces), dtype=np.float32
+            )
+            payloads.append((mesh, (vertices, faces, normals)))
+        return payloads
+
+    def _build_mesh3d(
+        self, mesh: trimesh.Trimesh, geometry, vertex_colors=None, albedo_texture=None
+    ) -> rr.Mesh3D:
+        """Build the rerun archetype for one trimesh. rerun archetypes are
+        plain data and safe to log repeatedly, so the result is cached.
+        Explicit ``vertex_colors``/``albedo_texture`` arrays override the
+        mesh's own visual."""
+        vertices, faces, normals = geometry
+        vertex_texcoords = None
+        if vertex_colors is not None or albedo_texture is not None:
+            pass
+        elif isinstance(mesh.visual, trimesh.visual.ColorVisuals):
+            vertex_colors = mesh.visual.vertex_colors
+        elif isinstance(mesh.visual, trimesh.visual.texture.TextureVisuals):
+            # glb/gltf meshes come through trimesh with a PBRMaterial, which
+            # keeps its texture in baseColorTexture; obj meshes use
+            # SimpleMaterial.image
+            mesh_material = mesh.visual.material
+            if isinstance(mesh_material, trimesh.visual.material.PBRMaterial):
+                image = mesh_material.baseColorTexture
+            else:
+                image = mesh_material.image
+            if image is not None:
+                # decode the embedded texture to a uint8 array now, while the
+                # archetype is built, rather than lazily on every log
+                albedo_texture = np.asarray(image.convert("RGBA"))
+                vertex_texcoords = mesh.visual.uv
+                if vertex_texcoords is not None:
+                    # trimesh uses the OpenGL convention, rerun expects flipped v
+                    vertex_texcoords = vertex_texcoords.copy()
+                    vertex_texcoords[:, 1] = 1.0 - vertex_texcoords[:, 1]
+            else:
+                # untextured material (e.g. PBR with only a baseColorFactor):
+                # fall back to its flat color
+                vertex_colors = np.ascontiguousarray(
+                    np.broadcast_to(
+                        np.asarray(mesh_material.main_color, dtype=np.uint8),
+                        (len(vertices), 4),
+                    )
+                )
+        else:
+            raise NotImplementedError(
+                f"Unsupported trimesh visual type: {type(mesh.visual)}"
+            )
+        return rr.Mesh3D(
+            vertex_positions=vertices,
+            triangle_indices=faces,
+            vertex_normals=normals,
+            vertex_colors=vertex_colors,
+            albedo_texture=albedo_texture,
+            vertex_texcoords=vertex_texcoords,
+        )
+
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-f",
+        "--filepath",
+        type=str,
+        default=f"{PACKAGE_ASSET_DIR}/robots/panda/panda_v2.urdf",
+        help="Path to the URDF file to visualize",
+    )
+    parser.add_argument(
+        "-n",
+        "--num-frames",
+        type=int,
+        default=200,
+        help="Number of frames of random joint rotations to log",
+    )
+    parser.add_argument(
+        "--per-frame",
+        action="store_true",
+        help="Log joint updates one frame at a time instead of as a single columnar send per joint. Slower, but mirrors how a live simulation would stream poses",
+    )
+    args = parser.parse_args()
+    return args
+
+
+def main(args):
+    rr.init("mani_skill_urdf", spawn=True)
+    urdf_logger = URDFLogger(args.filepath)
+    rr.set_time("frame", sequence=0)
+    urdf_logger.setup()
+    if args.per_frame:
+        for i in range(1, args.num_frames + 1):
+            rr.set_time("frame", sequence=i)
+            urdf_logger.update_joints_random()
+    else:
+        urdf_logger.log_random_joint_motion(args.num_frames)
+
+
+if __name__ == "__main__":
+    main(parse_args())